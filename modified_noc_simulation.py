@@ -1,11 +1,380 @@
 # modified_noc_simulation.py
 
-import random
-from collections import deque
+import functools
 from dataclasses import dataclass
 from typing import Optional, List, Dict
 import numpy as np
 
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:  # Numba is optional; kernels fall back to pure Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+    prange = range
+    _HAVE_NUMBA = False
+
+# Direction codes used by the flat adjacency tables (east, west, north,
+# south, up, down). -1 marks a missing or failed connection.
+_DIRECTIONS = ('east', 'west', 'north', 'south', 'up', 'down')
+_DIR_CODE = {name: code for code, name in enumerate(_DIRECTIONS)}
+# Opposite-direction lookups, hoisted to module scope so they are built
+# once rather than per call inside the topology build loop
+_OPPOSITE = {'east': 'west', 'west': 'east', 'north': 'south',
+             'south': 'north', 'up': 'down', 'down': 'up'}
+_OPP_CODE = (1, 0, 3, 2, 5, 4)
+_OPP_CODE_ARR = np.array(_OPP_CODE, dtype=np.int8)
+
+
+def _part1by2(v: np.ndarray) -> np.ndarray:
+    """Spread the low 10 bits of v so they occupy every third bit."""
+    v = np.asarray(v, dtype=np.uint32) & 0x3FF
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+def _morton_encode(x, y, z) -> np.ndarray:
+    """Interleave the bits of (x, y, z) into a Morton (Z-order) code.
+
+    Routers labelled in Morton order keep spatial neighbors close together
+    in the flat SoA arrays, so stencil and BFS passes touch nearby cache
+    lines instead of striding num_rows*num_cols elements along y and z.
+    """
+    return _part1by2(x) | (_part1by2(y) << 1) | (_part1by2(z) << 2)
+
+
+def _pack_bits(mask: np.ndarray) -> np.ndarray:
+    """Pack a boolean mask into a little-endian uint64 bitset."""
+    n64 = (mask.shape[0] + 63) // 64
+    packed = np.packbits(mask, bitorder='little')
+    out = np.zeros(n64 * 8, np.uint8)
+    out[:packed.shape[0]] = packed
+    return out.view(np.uint64)
+
+
+def _to_csr(neighbors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Compress an int32[N, 6] neighbor table into CSR (row_ptr, col_idx).
+
+    CSR packs each router's live neighbors contiguously, so graph kernels
+    scan exactly the edges that exist instead of testing six slots (most
+    with -1 holes) per router.
+    """
+    valid = neighbors >= 0
+    counts = valid.sum(axis=1, dtype=np.int32)
+    row_ptr = np.zeros(neighbors.shape[0] + 1, dtype=np.int32)
+    np.cumsum(counts, out=row_ptr[1:])
+    col_idx = neighbors[valid].astype(np.int32)
+    return row_ptr, col_idx
+
+
+@njit(cache=True)
+def _bit_test(bits, idx):
+    """Branchless failed-bit test against a uint64 bitset."""
+    return (bits[idx >> 6] >> np.uint64(idx & 63)) & np.uint64(1) != 0
+
+
+@njit(cache=True)
+def _bit_set(bits, idx):
+    bits[idx >> 6] |= np.uint64(1) << np.uint64(idx & 63)
+
+
+@njit(cache=True)
+def _build_next_hop(row_ptr, col_idx, failed_bits, queue):
+    """Build the all-pairs next-hop table via one BFS per destination.
+
+    Links are bidirectional, so a BFS outward from each destination assigns
+    every reachable router its first hop toward that destination. Routing a
+    packet then costs O(hops) table lookups instead of a fresh BFS. The
+    graph is given in CSR form, so the inner loop touches only live edges;
+    `queue` is caller-provided int32[N] scratch, reused across rebuilds,
+    and the table itself doubles as the visited mark, so no per-BFS
+    allocation occurs.
+    """
+    n = row_ptr.shape[0] - 1
+    next_hop = np.full((n, n), -1, dtype=np.int16)
+    for dst in range(n):
+        if _bit_test(failed_bits, dst):
+            continue
+        # A destination with no live links is unreachable from anywhere
+        # else, so its whole BFS is skipped (src == dst is handled by the
+        # walk's fast path and never consults the table)
+        if row_ptr[dst + 1] == row_ptr[dst]:
+            continue
+        head = 0
+        tail = 0
+        queue[tail] = dst
+        tail += 1
+        next_hop[dst, dst] = dst
+        while head < tail:
+            current = queue[head]
+            head += 1
+            for k in range(row_ptr[current], row_ptr[current + 1]):
+                nxt = col_idx[k]
+                if not _bit_test(failed_bits, nxt) and next_hop[nxt, dst] == -1:
+                    next_hop[nxt, dst] = current
+                    queue[tail] = nxt
+                    tail += 1
+    return next_hop
+
+
+@njit(cache=True)
+def _walk_route(next_hop, failed_bits, source, dest, path):
+    """Walk the next-hop table from source to dest into `path`.
+
+    Returns the hop count, or -1 when no live route exists (the table may
+    be stale with respect to routers that failed after it was built).
+    """
+    if source == dest:
+        path[0] = source
+        return 1
+    hops = 0
+    node = source
+    while node != dest:
+        path[hops] = node
+        hops += 1
+        node = next_hop[node, dest]
+        if node < 0 or _bit_test(failed_bits, node):
+            return -1
+    path[hops] = dest
+    return hops + 1
+
+
+@njit(parallel=True, cache=True)
+def _thermal_cycle(row_ptr, col_idx, temp_in, temp_out, power, fan):
+    """Parallel per-cycle thermal stencil over the CSR adjacency.
+
+    Each router only reads neighbor temperatures from `temp_in` and writes
+    its own slots of `temp_out` and `fan`, so the prange iterations are
+    race-free; the caller double-buffers the temperature array.
+    """
+    n = temp_in.shape[0]
+    tenth = np.float32(0.1)
+    half = np.float32(0.5)
+    for i in prange(n):
+        start = row_ptr[i]
+        end = row_ptr[i + 1]
+        nsum = np.float32(0.0)
+        for k in range(start, end):
+            nsum += temp_in[col_idx[k]]
+        t = temp_in[i]
+        if end > start:
+            t += half * (nsum / np.float32(end - start) - t) + power[i] * tenth - fan[i] * tenth
+        else:
+            t += power[i] * tenth - fan[i] * tenth
+        temp_out[i] = t
+        if t > 70:
+            fan[i] = min(fan[i] + np.float32(1.0), np.float32(5.0))
+        elif t < 60:
+            fan[i] = max(fan[i] - np.float32(1.0), np.float32(0.0))
+
+
+@njit(cache=True)
+def _run_cycles(row_ptr, col_idx, next_hop, temp, power, fan, failed, failed_bits,
+                buf, buffer_size, queue_slots, qtail,
+                pool_src, pool_dst, pool_size, pool_ctime, pool_start,
+                fire, srcs, dsts, sizes, start_cycle, start_sent,
+                lat_out, thr_out, pow_out):
+    """JIT-compiled simulation kernel operating on flat SoA arrays.
+
+    Runs the full cycle loop (packet injection, next-hop routing, buffer
+    and power accounting, thermal update) in machine code. Injection
+    decisions and packet parameters are pregenerated per cycle in `fire`,
+    `srcs`, `dsts` and `sizes`. Returns the number of packets sent and
+    dropped; per-cycle stats are written into the preallocated output
+    arrays. `srcs`, `dsts` and `sizes` are compact: one entry per set bit
+    in `fire`, consumed in order. Sent packets are recorded as rows in the
+    `pool_*` arrays (starting at `pool_start`) and enqueued by index into
+    the per-router `queue_slots` rings; no per-packet object is created.
+    """
+    n = temp.shape[0]
+    num_cycles = fire.shape[0]
+    path = np.empty(n, np.int32)
+    temp_next = np.empty_like(temp)  # double buffer for the thermal stencil
+    # float32 constants keep the state updates in single precision
+    # instead of upcasting through float64 on every element
+    tenth = np.float32(0.1)
+    idle_power = np.float32(1.0)
+    active_power = np.float32(2.5)
+    zero = np.float32(0.0)
+    packets_sent = 0
+    packets_dropped = 0
+    last_creation = -1
+    # Routers with a non-empty buffer, counted once here and then kept
+    # incrementally as buffers fill (they never drain in this model)
+    queued_count = 0
+    for i in range(n):
+        if buf[i] > 0:
+            queued_count += 1
+
+    inj = 0  # cursor into the compact injection arrays
+    for cycle in range(num_cycles):
+        clock = start_cycle + cycle + 1
+        if fire[cycle]:
+            source = srcs[inj]
+            dest = dsts[inj]
+            size = sizes[inj]
+            inj += 1
+            if source != dest:
+                hops = _walk_route(next_hop, failed_bits, source, dest, path)
+                if hops > 0:
+                    pkt = pool_start + packets_sent
+                    pool_src[pkt] = source
+                    pool_dst[pkt] = dest
+                    pool_size[pkt] = size
+                    pool_ctime[pkt] = clock
+                    packets_sent += 1
+                    last_creation = clock
+                    for i in range(hops):
+                        router = path[i]
+                        if buf[router] >= buffer_size:
+                            packets_dropped += 1
+                            break
+                        if buf[router] == 0:
+                            queued_count += 1
+                        buf[router] += 1
+                        queue_slots[router, qtail[router] % buffer_size] = pkt
+                        qtail[router] += 1
+                        power[router] += tenth * np.float32(size)
+
+        # Power/state update + power accounting
+        total_power = 0.0
+        for i in range(n):
+            total_power += power[i]
+            if temp[i] > 85 and not failed[i]:
+                failed[i] = True
+                _bit_set(failed_bits, i)
+            if failed[i]:
+                power[i] = zero
+            elif buf[i] < 0.3 * buffer_size:
+                power[i] = idle_power
+            else:
+                power[i] = active_power
+        pow_out[cycle] = total_power
+
+        # Thermal stencil, parallel over routers with double-buffered temps
+        _thermal_cycle(row_ptr, col_idx, temp, temp_next, power, fan)
+        temp[:] = temp_next
+
+        # Latency/throughput stats
+        if queued_count > 0 and last_creation >= 0:
+            lat_out[cycle] = clock - last_creation
+        else:
+            lat_out[cycle] = 0.0
+        thr_out[cycle] = (start_sent + packets_sent) / clock
+
+    return packets_sent, packets_dropped
+
+
+def _run_cycles_py(row_ptr, col_idx, next_hop, temp, power, fan, failed, failed_bits,
+                   buf, buffer_size, queue_slots, qtail,
+                   pool_src, pool_dst, pool_size, pool_ctime, pool_start,
+                   fire, srcs, dsts, sizes, start_cycle, start_sent,
+                   lat_out, thr_out, pow_out):
+    """Pure-Python fallback for _run_cycles, used when Numba is absent.
+
+    Mirrors the kernel cycle for cycle, but replaces its scalar per-router
+    loops with fused vectorized passes over the SoA arrays: one pass per
+    cycle applies power accounting, overheating failures and power-state
+    switching with boolean masks, and the thermal stencil computes all
+    neighbor sums at once with np.add.reduceat over the CSR adjacency
+    instead of interpreting the kernel's element-wise loops in Python.
+    Injection touches at most one route per cycle and stays scalar.
+    """
+    n = temp.shape[0]
+    num_cycles = fire.shape[0]
+    path = np.empty(n, np.int32)
+    tenth = np.float32(0.1)
+    half = np.float32(0.5)
+    packets_sent = 0
+    packets_dropped = 0
+    last_creation = -1
+    # Non-empty buffers, counted once and kept incrementally (see kernel)
+    queued_count = int(np.count_nonzero(buf > 0))
+    idle_level = 0.3 * buffer_size
+
+    # Static segment layout for the reduceat neighbor sums; rows with no
+    # live neighbors get a bogus single-element "sum" that the isolated
+    # mask clears each cycle
+    deg = np.diff(row_ptr)
+    isolated = deg == 0
+    ncount = np.maximum(deg, 1).astype(np.float32)
+    starts = np.minimum(row_ptr[:-1], max(col_idx.shape[0] - 1, 0))
+
+    inj = 0  # cursor into the compact injection arrays
+    for cycle in range(num_cycles):
+        clock = start_cycle + cycle + 1
+        if fire[cycle]:
+            source = srcs[inj]
+            dest = dsts[inj]
+            size = sizes[inj]
+            inj += 1
+            if source != dest:
+                hops = _walk_route(next_hop, failed_bits, source, dest, path)
+                if hops > 0:
+                    pkt = pool_start + packets_sent
+                    pool_src[pkt] = source
+                    pool_dst[pkt] = dest
+                    pool_size[pkt] = size
+                    pool_ctime[pkt] = clock
+                    packets_sent += 1
+                    last_creation = clock
+                    for i in range(hops):
+                        router = path[i]
+                        if buf[router] >= buffer_size:
+                            packets_dropped += 1
+                            break
+                        if buf[router] == 0:
+                            queued_count += 1
+                        buf[router] += 1
+                        queue_slots[router, qtail[router] % buffer_size] = pkt
+                        qtail[router] += 1
+                        power[router] += tenth * np.float32(size)
+
+        # Fused power/state update: record total power drawn this cycle,
+        # fail overheated routers, then switch power levels by state
+        pow_out[cycle] = power.sum()
+        overheated = (temp > 85) & ~failed
+        if overheated.any():
+            failed |= overheated
+            for i in np.nonzero(overheated)[0]:
+                _bit_set(failed_bits, int(i))
+        idle = buf < idle_level
+        power[idle] = np.float32(1.0)
+        power[~idle] = np.float32(2.5)
+        power[failed] = np.float32(0.0)
+
+        # Thermal stencil: segment-sum neighbor temperatures in one
+        # reduceat, then apply conduction, heating and fan cooling; the
+        # delta is computed entirely from the pre-update temperatures, so
+        # no explicit double buffer is needed
+        if col_idx.shape[0]:
+            nsum = np.add.reduceat(temp[col_idx], starts)
+            delta = half * (nsum / ncount - temp)
+            delta[isolated] = np.float32(0)
+        else:
+            delta = np.float32(0)
+        temp += delta + power * tenth - fan * tenth
+        hot = temp > 70
+        cold = temp < 60
+        fan[hot] = np.minimum(fan[hot] + np.float32(1.0), np.float32(5.0))
+        fan[cold] = np.maximum(fan[cold] - np.float32(1.0), np.float32(0.0))
+
+        # Latency/throughput stats
+        if queued_count > 0 and last_creation >= 0:
+            lat_out[cycle] = clock - last_creation
+        else:
+            lat_out[cycle] = 0.0
+        thr_out[cycle] = (start_sent + packets_sent) / clock
+
+    return packets_sent, packets_dropped
+
+
 @dataclass
 class Packet:
     """Represents a data packet in the network."""
@@ -16,26 +385,145 @@ class Packet:
     priority: int = 0
     current_hop_count: int = 0
 
+# Router buffer capacity in packets (also the per-router queue ring size)
+_BUFFER_SIZE = 64
+
+
+class _PacketPool:
+    """Structure-of-arrays pool of injected packets.
+
+    A packet in flight is a row index into these arrays, so enqueueing a
+    packet writes four int32 slots instead of allocating a Packet dataclass
+    instance per queue it enters.
+    """
+    def __init__(self, capacity: int = 64):
+        self.source = np.empty(capacity, dtype=np.int32)
+        self.destination = np.empty(capacity, dtype=np.int32)
+        self.size = np.empty(capacity, dtype=np.int32)
+        self.creation_time = np.empty(capacity, dtype=np.int32)
+        self.count = 0
+
+    def reserve(self, extra: int) -> None:
+        """Grow the arrays so at least `extra` more packets fit."""
+        needed = self.count + extra
+        capacity = self.source.shape[0]
+        if needed > capacity:
+            new_capacity = max(needed, 2 * capacity)
+            for name in ('source', 'destination', 'size', 'creation_time'):
+                grown = np.empty(new_capacity, dtype=np.int32)
+                grown[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, grown)
+
+    def append(self, source: int, destination: int, size: int, creation_time: int) -> int:
+        """Add a packet and return its pool index."""
+        self.reserve(1)
+        idx = self.count
+        self.source[idx] = source
+        self.destination[idx] = destination
+        self.size[idx] = size
+        self.creation_time[idx] = creation_time
+        self.count = idx + 1
+        return idx
+
+
+class _RouterState:
+    """Structure-of-arrays backing store for per-router state.
+
+    Keeping temperature, power, fan speed, failure flags and buffer usage in
+    contiguous NumPy arrays lets the topology update every router in a single
+    vectorized pass instead of looping over Router objects. Per-router packet
+    queues are fixed-size rings of pool indices into the shared _PacketPool.
+    """
+    def __init__(self, num_routers: int):
+        self.temperature = np.full(num_routers, 25.0, dtype=np.float32)  # Celsius
+        self.power = np.zeros(num_routers, dtype=np.float32)  # Watts
+        self.fan_speed = np.zeros(num_routers, dtype=np.float32)
+        self.failed = np.zeros(num_routers, dtype=bool)
+        self.buffer_usage = np.zeros(num_routers, dtype=np.int32)
+        self.active = np.zeros(num_routers, dtype=bool)  # power state: active vs idle
+        self.drops = np.zeros(num_routers, dtype=np.int32)
+        self.queue_slots = np.full((num_routers, _BUFFER_SIZE), -1, dtype=np.int32)
+        # Queues never drain in this model, so only the tail cursor is
+        # tracked; qtail doubles as the occupancy count
+        self.qtail = np.zeros(num_routers, dtype=np.int32)
+        self.pool = _PacketPool()
+
 class Router:
-    """Enhanced router class with power and thermal modeling."""
-    def __init__(self, router_id: int, latency: int = 1):
+    """Enhanced router class with power and thermal modeling.
+
+    Router state lives in the topology's shared `_RouterState` arrays; each
+    instance is a thin view indexing into them, so scalar access through the
+    properties below stays available while bulk updates run vectorized.
+    """
+    buffer_size = _BUFFER_SIZE  # Buffer size in packets
+
+    def __init__(self, router_id: int, latency: int = 1, state: Optional[_RouterState] = None):
         self.router_id = router_id
         self.latency = latency
-        self.ports: Dict[str, Optional['Link']] = {
-            'east': None, 'west': None,
-            'north': None, 'south': None,
-            'up': None, 'down': None
-        }
-        self.failed = False
-        self.buffer_size = 64  # Buffer size in packets
-        self.current_buffer_usage = 0
-        self.temperature = 25.0  # Initial temperature in Celsius
-        self.power_consumption = 0.0  # Power consumption in Watts
-        self.packet_queue = deque()
-        self.power_state = 'idle'  # Track power state for consumption modeling
-        self.fan_speed = 0  # Fan speed for cooling
+        if state is None:
+            state = _RouterState(1)
+            self._slot = 0
+        else:
+            self._slot = router_id
+        self._state = state
         self.packet_loss_rate = 0.0
 
+    @property
+    def temperature(self) -> float:
+        return float(self._state.temperature[self._slot])
+
+    @temperature.setter
+    def temperature(self, value: float):
+        self._state.temperature[self._slot] = value
+
+    @property
+    def power_consumption(self) -> float:
+        return float(self._state.power[self._slot])
+
+    @power_consumption.setter
+    def power_consumption(self, value: float):
+        self._state.power[self._slot] = value
+
+    @property
+    def fan_speed(self) -> float:
+        return float(self._state.fan_speed[self._slot])
+
+    @fan_speed.setter
+    def fan_speed(self, value: float):
+        self._state.fan_speed[self._slot] = value
+
+    @property
+    def failed(self) -> bool:
+        return bool(self._state.failed[self._slot])
+
+    @failed.setter
+    def failed(self, value: bool):
+        self._state.failed[self._slot] = value
+
+    @property
+    def current_buffer_usage(self) -> int:
+        return int(self._state.buffer_usage[self._slot])
+
+    @current_buffer_usage.setter
+    def current_buffer_usage(self, value: int):
+        self._state.buffer_usage[self._slot] = value
+
+    @property
+    def power_state(self) -> str:
+        return 'active' if self._state.active[self._slot] else 'idle'
+
+    @power_state.setter
+    def power_state(self, value: str):
+        self._state.active[self._slot] = (value == 'active')
+
+    @property
+    def dropped_packets(self) -> int:
+        return int(self._state.drops[self._slot])
+
+    @dropped_packets.setter
+    def dropped_packets(self, value: int):
+        self._state.drops[self._slot] = value
+
     def update_thermal_model(self, ambient_temp: float, neighboring_temps: List[float]):
         """Update router temperature based on power consumption and neighboring temperatures."""
         thermal_conductivity = 0.5
@@ -75,22 +563,30 @@ class Router:
         self.adjust_power_consumption()
 
     def process_packet(self, packet: Packet) -> bool:
-        """Process a packet and update power consumption."""
+        """Process a packet and update power consumption.
+
+        The packet is appended to the shared pool and its index enqueued in
+        this router's fixed-size ring, so no per-packet state is held on the
+        Router itself.
+        """
+        st = self._state
         if self.current_buffer_usage >= self.buffer_size:
             return False
-        self.packet_queue.append(packet)
+        idx = st.pool.append(packet.source_id, packet.destination_id,
+                             packet.size, packet.creation_time)
+        st.queue_slots[self._slot, st.qtail[self._slot] % _BUFFER_SIZE] = idx
+        st.qtail[self._slot] += 1
         self.current_buffer_usage += 1
         self.power_consumption += 0.1 * packet.size
         return True
 
     def handle_packet(self, packet: Packet, current_time: int):
-        """Handle packet routing and update packet loss rate."""
+        """Handle packet routing and update loss accounting."""
         if self.failed or self.current_buffer_usage >= self.buffer_size:
-            self.packet_loss_rate += 1 / (self.packet_loss_rate + 1)
+            self.dropped_packets += 1
             return
         self.current_buffer_usage += 1
-        latency = self.calculate_latency(packet.creation_time, current_time)
-        self.packet_loss_rate = getattr(self, 'packet_loss_rate', 0) + latency
+        self.packet_loss_rate += self.calculate_latency(packet.creation_time, current_time)
         self.apply_backpressure()
 
     def calculate_latency(self, creation_time, current_time):
@@ -102,15 +598,77 @@ class Router:
         if self.current_buffer_usage >= self.buffer_size * 0.8:
             self.failed = True
 
+class _LinkState:
+    """Structure-of-arrays backing store for per-link state.
+
+    Mirrors _RouterState: keeping latency, bandwidth, load and failure
+    flags in contiguous arrays lets fault injection and adjacency
+    filtering treat all links at once instead of touching Link objects.
+    """
+    def __init__(self, num_links: int):
+        self.latency = np.zeros(num_links, dtype=np.int32)
+        self.bandwidth = np.ones(num_links, dtype=np.float32)
+        self.utilization = np.zeros(num_links, dtype=np.float32)
+        self.current_load = np.zeros(num_links, dtype=np.float32)
+        self.failed = np.zeros(num_links, dtype=bool)
+
 class Link:
-    """Enhanced link class with bandwidth and congestion modeling."""
-    def __init__(self, link_id: int, latency: int = 1, bandwidth: float = 1.0):
+    """Enhanced link class with bandwidth and congestion modeling.
+
+    Like Router, Link instances are thin views over the topology's shared
+    _LinkState arrays rather than owners of their own scalar attributes.
+    """
+    def __init__(self, link_id: int, latency: int = 1, bandwidth: float = 1.0,
+                 state: Optional[_LinkState] = None):
         self.link_id = link_id
-        self.latency = latency
-        self.bandwidth = bandwidth
-        self.utilization = 0.0
-        self.failed = False
-        self.current_load = 0
+        if state is None:
+            state = _LinkState(1)
+            self._slot = 0
+        else:
+            self._slot = link_id
+        self._state = state
+        state.latency[self._slot] = latency
+        state.bandwidth[self._slot] = bandwidth
+
+    @property
+    def latency(self) -> int:
+        return int(self._state.latency[self._slot])
+
+    @latency.setter
+    def latency(self, value: int):
+        self._state.latency[self._slot] = value
+
+    @property
+    def bandwidth(self) -> float:
+        return float(self._state.bandwidth[self._slot])
+
+    @bandwidth.setter
+    def bandwidth(self, value: float):
+        self._state.bandwidth[self._slot] = value
+
+    @property
+    def utilization(self) -> float:
+        return float(self._state.utilization[self._slot])
+
+    @utilization.setter
+    def utilization(self, value: float):
+        self._state.utilization[self._slot] = value
+
+    @property
+    def failed(self) -> bool:
+        return bool(self._state.failed[self._slot])
+
+    @failed.setter
+    def failed(self, value: bool):
+        self._state.failed[self._slot] = value
+
+    @property
+    def current_load(self) -> float:
+        return float(self._state.current_load[self._slot])
+
+    @current_load.setter
+    def current_load(self, value: float):
+        self._state.current_load[self._slot] = value
 
     def can_transmit(self, packet_size: int) -> bool:
         """Check if link can handle additional transmission."""
@@ -130,43 +688,108 @@ class Wafer3DMeshTopology:
         self.total_packets_dropped = 0
         self.routers = []
         self.links = []
+        self.fault_count: Dict[str, int] = {}
+        self.state = _RouterState(0)
+        self.link_state = _LinkState(0)
+        self._next_hop = None
+        self._row_ptr = None
+        self._col_idx = None
+        self._route_dirty = True
+        self._csr_dirty = True
+        self._route_cache: Dict[tuple[int, int, int], Optional[np.ndarray]] = {}
+        self._fault_epoch = 0
+        self._rng = np.random.default_rng()
 
     def createTopology(self) -> tuple[List[Router], List[Link]]:
-        """Create 3D topology with fault injection and monitoring."""
+        """Create 3D topology with fault injection and monitoring.
+
+        The candidate links for each direction are generated by slicing the
+        id grid against itself shifted one step along that axis, with one
+        batched random draw deciding which candidates survive fault
+        injection; the adjacency tables are then filled with four indexed
+        scatter assignments instead of a triple-nested Python loop.
+        """
         total_routers = self.num_rows * self.num_cols * self.num_layers
-        self.routers = [Router(router_id=i, latency=self.router_latency) for i in range(total_routers)]
-        self.links = []
-        
-        for z in range(self.num_layers):
-            for y in range(self.num_cols):
-                for x in range(self.num_rows):
-                    idx = self._get_router_index(x, y, z)
-                    router = self.routers[idx]
-                    self._connect_neighbors(router, x, y, z)
+        self._morton_rank, self._linear_index, cand_src, cand_dst, cand_code = \
+            self._build_edges(self.num_rows, self.num_cols, self.num_layers)
+        self.state = _RouterState(total_routers)
+        self.nbr = np.full((total_routers, 6), -1, dtype=np.int32)
+        self.port_link = np.full((total_routers, 6), -1, dtype=np.int32)
+        # Reusable routing scratch buffers (avoid per-call allocation)
+        self._bfs_queue = np.empty(total_routers, dtype=np.int32)
+        self._route_buf = np.empty(total_routers, dtype=np.int32)
+        self.routers = [Router(router_id=i, latency=self.router_latency, state=self.state) for i in range(total_routers)]
+
+        # One batched draw over the cached candidate set decides which
+        # links survive build-time fault injection
+        keep = self._rng.random(cand_src.shape[0]) > self.fault_probability
+        # Aggregate count of candidate links lost to faults, kept per
+        # direction for reporting (no per-link logging)
+        self.fault_count = {
+            _DIRECTIONS[code]: int(np.count_nonzero(~keep & (cand_code == code)))
+            for code in (_DIR_CODE['east'], _DIR_CODE['south'], _DIR_CODE['down'])}
 
+        src_all = cand_src[keep]
+        dst_all = cand_dst[keep]
+        code_all = cand_code[keep]
+        opp_all = _OPP_CODE_ARR[code_all]
+        edge_ids = np.arange(src_all.shape[0], dtype=np.int32)
+
+        self.nbr[src_all, code_all] = dst_all
+        self.nbr[dst_all, opp_all] = src_all
+        self.port_link[src_all, code_all] = edge_ids
+        self.port_link[dst_all, opp_all] = edge_ids
+
+        self.link_state = _LinkState(edge_ids.shape[0])
+        self.links = [Link(int(i), self.link_latency, 1.0, self.link_state)
+                      for i in edge_ids]
+
+        self._route_dirty = True
+        self._csr_dirty = True
+        # Rebuilding rewires the mesh, so routes memoized against the old
+        # topology must not survive
+        self._bump_fault_epoch()
         return self.routers, self.links
 
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _build_edges(num_rows: int, num_cols: int, num_layers: int):
+        """Shape-keyed Morton labelling and candidate edge set, cached.
+
+        Router ids are assigned by Morton (Z-order) rank of their
+        coordinates (codes for non-power-of-two grids are sparse, so dense
+        ranks are used); the candidate (src, dst, direction) arrays cover
+        every axis-aligned link of the mesh. Both depend only on the grid
+        shape, so topologies with the same dimensions share them and only
+        redraw the fault mask. The returned arrays are shared across
+        instances and therefore marked read-only.
+        """
+        total_routers = num_rows * num_cols * num_layers
+        zz, yy, xx = np.meshgrid(np.arange(num_layers), np.arange(num_cols),
+                                 np.arange(num_rows), indexing='ij')
+        codes = _morton_encode(xx.ravel(), yy.ravel(), zz.ravel())
+        order = np.argsort(codes, kind='stable').astype(np.int32)
+        morton_rank = np.empty(total_routers, np.int32)
+        morton_rank[order] = np.arange(total_routers, dtype=np.int32)
+
+        grid = morton_rank.reshape(num_layers, num_cols, num_rows)
+        # All wired directions are axis-aligned unit steps (distance factor
+        # 1.0), so the fault probability and bandwidth need no scaling
+        edge_specs = ((_DIR_CODE['east'], grid[:, :, :-1], grid[:, :, 1:]),
+                      (_DIR_CODE['south'], grid[:, :-1, :], grid[:, 1:, :]),
+                      (_DIR_CODE['down'], grid[:-1, :, :], grid[1:, :, :]))
+        src_all = np.concatenate([src.ravel() for _, src, _ in edge_specs])
+        dst_all = np.concatenate([dst.ravel() for _, _, dst in edge_specs])
+        code_all = np.concatenate([np.full(src.size, code, dtype=np.int8)
+                                   for code, src, _ in edge_specs])
+        for arr in (morton_rank, order, src_all, dst_all, code_all):
+            arr.setflags(write=False)
+        return morton_rank, order, src_all, dst_all, code_all
+
     def _get_router_index(self, x: int, y: int, z: int) -> int:
-        """Calculate router index from coordinates."""
-        return z * (self.num_rows * self.num_cols) + y * self.num_rows + x
-
-    def _connect_neighbors(self, router: Router, x: int, y: int, z: int) -> None:
-        """Connect router to its neighbors with enhanced fault modeling."""
-        directions = [('east', (1, 0, 0)), ('south', (0, 1, 0)), ('down', (0, 0, 1))]
-        
-        for direction, (dx, dy, dz) in directions:
-            if self._is_valid_position(x + dx, y + dy, z + dz):
-                neighbor_idx = self._get_router_index(x + dx, y + dy, z + dz)
-                distance_factor = np.sqrt(dx * dx + dy * dy + dz * dz)
-                fault_prob = self.fault_probability * distance_factor
-                
-                if random.random() > fault_prob:
-                    bandwidth = 1.0 / distance_factor
-                    link = Link(len(self.links), self.link_latency, bandwidth)
-                    opposite_direction = self._get_opposite_direction(direction)
-                    router.ports[direction] = link
-                    self.routers[neighbor_idx].ports[opposite_direction] = link
-                    self.links.append(link)
+        """Calculate router index (Morton rank) from coordinates."""
+        linear = z * (self.num_rows * self.num_cols) + y * self.num_rows + x
+        return int(self._morton_rank[linear])
 
     def _is_valid_position(self, x: int, y: int, z: int) -> bool:
         """Check if position is within topology bounds."""
@@ -174,94 +797,160 @@ class Wafer3DMeshTopology:
 
     def _get_opposite_direction(self, direction: str) -> str:
         """Get opposite direction for bidirectional connections."""
-        opposites = {'east': 'west', 'west': 'east', 'north': 'south', 'south': 'north', 'up': 'down', 'down': 'up'}
-        return opposites[direction]
+        return _OPPOSITE[direction]
+
+    def _build_neighbor_table(self) -> np.ndarray:
+        """Return the int32[N, 6] adjacency table restricted to live links.
+
+        Entry [i, d] holds the neighbor id of router i in direction d
+        (see _DIRECTIONS), or -1 when there is no live link that way. The
+        static wiring is precomputed in createTopology; this only masks
+        out entries whose link has failed.
+        """
+        neighbors = self.nbr.copy()
+        if self.links:
+            wired = self.port_link >= 0
+            dead = np.zeros_like(wired)
+            dead[wired] = self.link_state.failed[self.port_link[wired]]
+            neighbors[dead] = -1
+        return neighbors
 
     def simulate_network(self, num_cycles: int, packet_injection_rate: float = 0.1):
-        """Simulate network behavior over time."""
-        stats = {'latency': [], 'throughput': [], 'dropped_packets': 0, 'power_consumption': []}
-        
-        for _ in range(num_cycles):
-            self.clock_cycle += 1
-            if random.random() < packet_injection_rate:
-                source = random.choice(self.routers)
-                dest = random.choice(self.routers)
-                if source.router_id != dest.router_id:
-                    packet = Packet(source.router_id, dest.router_id, self.clock_cycle, random.randint(1, 10))
-                    route = self.find_backup_route(source, dest)
-                    if route:
-                        self.total_packets_sent += 1
-                        for router in route:
-                            if not router.process_packet(packet):
-                                stats['dropped_packets'] += 1
-                                break
-            total_power = 0
-            for router in self.routers:
-                total_power += router.power_consumption
-                router.update_state_based_on_conditions()
-                router.update_temperature()
-
-            stats['power_consumption'].append(total_power)
-
-            # Calculate latency and throughput
-            avg_latency = np.mean([router.calculate_latency(packet.creation_time, self.clock_cycle)
-                                   for router in self.routers if router.packet_queue])
-            throughput = self.total_packets_sent / self.clock_cycle
-
-            stats['latency'].append(avg_latency if avg_latency else 0)
-            stats['throughput'].append(throughput)
-
-        return stats
+        """Simulate network behavior over time.
+
+        The cycle loop runs in the JIT-compiled _run_cycles kernel over flat
+        SoA arrays; this wrapper only flattens the topology and packages the
+        results.
+        """
+        neighbors = self._build_neighbor_table()
+        next_hop = self._ensure_next_hop(neighbors)
+        row_ptr, col_idx = self._live_csr(neighbors)
+        lat_out = np.empty(num_cycles, dtype=np.float32)
+        thr_out = np.empty(num_cycles, dtype=np.float32)
+        pow_out = np.empty(num_cycles, dtype=np.float32)
+
+        # Pregenerate all injection decisions and packet parameters in
+        # four batched RNG calls instead of per-cycle draws; packet
+        # parameters are drawn only for the cycles that actually inject
+        n = len(self.routers)
+        fire = self._rng.random(num_cycles) < packet_injection_rate
+        num_injections = int(np.count_nonzero(fire))
+        srcs = self._rng.integers(0, n, num_injections, dtype=np.int32)
+        dsts = self._rng.integers(0, n, num_injections, dtype=np.int32)
+        sizes = self._rng.integers(1, 11, num_injections, dtype=np.int32)
+
+        # Make room in the shared packet pool for the worst case; the
+        # kernel records sent packets directly into the pool arrays
+        pool = self.state.pool
+        pool.reserve(num_injections)
+
+        kernel = _run_cycles if _HAVE_NUMBA else _run_cycles_py
+        sent, dropped = kernel(
+            row_ptr, col_idx, next_hop, self.state.temperature, self.state.power,
+            self.state.fan_speed, self.state.failed,
+            _pack_bits(self.state.failed), self.state.buffer_usage,
+            Router.buffer_size, self.state.queue_slots, self.state.qtail,
+            pool.source, pool.destination, pool.size, pool.creation_time,
+            pool.count, fire, srcs, dsts, sizes,
+            self.clock_cycle, self.total_packets_sent,
+            lat_out, thr_out, pow_out)
+
+        pool.count += sent
+        self.clock_cycle += num_cycles
+        self.total_packets_sent += sent
+        self.total_packets_dropped += dropped
+        # Routers may have failed thermally during the run
+        self._route_dirty = True
+        self._bump_fault_epoch()
+
+        return {'latency': lat_out,
+                'throughput': thr_out,
+                'dropped_packets': dropped,
+                'power_consumption': pow_out}
+
+    def _ensure_next_hop(self, neighbors: Optional[np.ndarray] = None) -> np.ndarray:
+        """Return the all-pairs next-hop table, rebuilding it if stale.
+
+        The topology only changes when faults are injected (or routers fail
+        thermally during a simulation run), so the table is rebuilt lazily
+        on the next routing request after such an event.
+        """
+        if self._route_dirty or self._next_hop is None:
+            row_ptr, col_idx = self._live_csr(neighbors)
+            self._next_hop = _build_next_hop(row_ptr, col_idx,
+                                             _pack_bits(self.state.failed),
+                                             self._bfs_queue)
+            self._route_dirty = False
+        return self._next_hop
+
+    def _live_csr(self, neighbors: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return CSR (row_ptr, col_idx) of the live adjacency, rebuilding if stale."""
+        if self._csr_dirty or self._row_ptr is None:
+            if neighbors is None:
+                neighbors = self._build_neighbor_table()
+            self._row_ptr, self._col_idx = _to_csr(neighbors)
+            self._csr_dirty = False
+        return self._row_ptr, self._col_idx
+
+    def _bump_fault_epoch(self) -> None:
+        """Advance the fault epoch and evict routes memoized under old epochs.
+
+        Cache keys carry the epoch, so entries from previous epochs can
+        never hit again; clearing here keeps the cache bounded to routes
+        requested since the last topology change.
+        """
+        self._fault_epoch += 1
+        self._route_cache.clear()
 
     def find_backup_route(self, source: Router, destination: Router) -> Optional[List[Router]]:
-        """Finds a backup route between source and destination, avoiding failed routers and links."""
-        visited = set()
-        queue = deque([(source, [source])])
-
-        while queue:
-            current_router, path = queue.popleft()
-            if current_router == destination:
-                return path
-            for direction, link in current_router.ports.items():
-                if link and not link.failed:
-                    next_router = self.get_neighbor_router(current_router, direction)
-                    if next_router and next_router not in visited and not next_router.failed:
-                        visited.add(next_router)
-                        queue.append((next_router, path + [next_router]))
+        """Finds a backup route between source and destination, avoiding failed routers and links.
+
+        Routes are memoized per (source, destination) pair; the cache is
+        keyed on the fault epoch, so entries invalidate automatically when
+        faults change the topology.
+        """
+        if source.router_id == destination.router_id:
+            return [source]
+        key = (source.router_id, destination.router_id, self._fault_epoch)
+        route_ids = self._route_cache.get(key, False)
+        if route_ids is False:
+            next_hop = self._ensure_next_hop()
+            hops = _walk_route(next_hop, _pack_bits(self.state.failed),
+                               source.router_id, destination.router_id,
+                               self._route_buf)
+            route_ids = self._route_buf[:hops].copy() if hops >= 0 else None
+            self._route_cache[key] = route_ids
+        if route_ids is None:
+            return None
+        return [self.routers[i] for i in route_ids]
+
+    def get_link(self, router: Router, direction: str) -> Optional[Link]:
+        """Returns the link leaving a router in a given direction, if any."""
+        link_id = self.port_link[router.router_id, _DIR_CODE[direction]]
+        if link_id >= 0:
+            return self.links[link_id]
         return None
 
     def get_neighbor_router(self, router: Router, direction: str) -> Optional[Router]:
-        """Returns neighboring router in a given direction."""
-        x, y, z = self.get_router_position(router.router_id)
-        if direction == 'east':
-            x += 1
-        elif direction == 'west':
-            x -= 1
-        elif direction == 'north':
-            y -= 1
-        elif direction == 'south':
-            y += 1
-        elif direction == 'up':
-            z += 1
-        elif direction == 'down':
-            z -= 1
-        if self._is_valid_position(x, y, z):
-            return self.routers[self._get_router_index(x, y, z)]
+        """Returns the linked neighboring router in a given direction."""
+        neighbor_idx = self.nbr[router.router_id, _DIR_CODE[direction]]
+        if neighbor_idx >= 0:
+            return self.routers[neighbor_idx]
         return None
 
     def get_router_position(self, router_id: int) -> tuple[int, int, int]:
         """Converts router ID back to 3D position."""
+        linear = int(self._linear_index[router_id])
         layer_size = self.num_rows * self.num_cols
-        z = router_id // layer_size
-        y = (router_id % layer_size) // self.num_rows
-        x = router_id % self.num_rows
+        z = linear // layer_size
+        y = (linear % layer_size) // self.num_rows
+        x = linear % self.num_rows
         return x, y, z
 
     def inject_faults(self):
         """Randomly inject faults in routers and links based on probability."""
-        for router in self.routers:
-            if random.random() < self.fault_probability:
-                router.failed = True
-        for link in self.links:
-            if random.random() < self.fault_probability:
-                link.failed = True
+        self.state.failed |= self._rng.random(len(self.routers)) < self.fault_probability
+        self.link_state.failed |= self._rng.random(len(self.links)) < self.fault_probability
+        self._route_dirty = True
+        self._csr_dirty = True
+        self._bump_fault_epoch()